@@ -0,0 +1,88 @@
+"""
+Benchmark near-duplicate lookup latency against index size.
+
+Compares HammingIndex (multi-index hashing) with a vectorised NumPy linear
+scan over the same random 64-bit hashes. Half of the queries are planted
+near-duplicates (a few flipped bits), half are random misses.
+
+    cd backend
+    python bench_phash.py --sizes 1000 10000 100000 1000000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+
+from phash_index import HammingIndex, popcount64
+
+
+def _linear_scan(hashes: np.ndarray, query: int, max_distance: int) -> np.ndarray:
+    return np.nonzero(popcount64(hashes ^ np.uint64(query)) <= max_distance)[0]
+
+
+def _flip(value: int, bits: int, rng: random.Random) -> int:
+    for position in rng.sample(range(64), bits):
+        value ^= 1 << position
+    return value
+
+
+def _percentiles_us(samples: list[float]) -> tuple[float, float, float]:
+    ordered = sorted(samples)
+    pick = lambda pct: ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))] * 1e6
+    return sum(ordered) / len(ordered) * 1e6, pick(50), pick(99)
+
+
+def run(sizes: list[int], queries: int, max_distance: int, seed: int) -> None:
+    rng = random.Random(seed)
+    print(f"radius={max_distance} queries={queries} (latencies in microseconds)")
+    print(f"{'size':>9} {'build s':>8} | {'MIH mean':>9} {'p50':>7} {'p99':>7} | {'scan mean':>10} {'p50':>8} {'p99':>8}")
+    for size in sizes:
+        values = [rng.getrandbits(64) for _ in range(size)]
+        start = time.perf_counter()
+        index = HammingIndex()
+        for i, value in enumerate(values):
+            index.add(value, i)
+        build = time.perf_counter() - start
+        array = np.array(values, dtype=np.uint64)
+
+        probes = []
+        for q in range(queries):
+            if q % 2 == 0:
+                probes.append(_flip(rng.choice(values), rng.randint(0, max_distance), rng))
+            else:
+                probes.append(rng.getrandbits(64))
+
+        mih, scan = [], []
+        for probe in probes:
+            t0 = time.perf_counter()
+            found = index.search(probe, max_distance)
+            t1 = time.perf_counter()
+            expected = _linear_scan(array, probe, max_distance)
+            t2 = time.perf_counter()
+            if len(found) != len(expected):
+                raise AssertionError(f"MIH returned {len(found)} hits, scan {len(expected)}")
+            mih.append(t1 - t0)
+            scan.append(t2 - t1)
+
+        m_mean, m50, m99 = _percentiles_us(mih)
+        s_mean, s50, s99 = _percentiles_us(scan)
+        print(
+            f"{size:>9} {build:>8.2f} | {m_mean:>9.1f} {m50:>7.1f} {m99:>7.1f} | "
+            f"{s_mean:>10.1f} {s50:>8.1f} {s99:>8.1f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark perceptual-hash lookup latency.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--max-distance", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    run(args.sizes, args.queries, args.max_distance, args.seed)
+
+
+if __name__ == "__main__":
+    main()
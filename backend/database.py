@@ -1,20 +1,41 @@
 """
 Database configuration – Supabase PostgreSQL via SQLAlchemy.
+
+A local SQLite file (DATABASE_URL=sqlite:///path.db) works as a stand-in for
+offline development and load testing.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 import os
-from sqlalchemy import create_engine, text
+import time
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.exc import DBAPIError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from metrics import DB_QUERY_ERRORS, DB_QUERY_SECONDS
+
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+_IS_SQLITE = bool(DATABASE_URL) and DATABASE_URL.startswith("sqlite")
+
 engine = create_engine(
     DATABASE_URL,
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    # Writers queue on SQLite's file lock; wait for it instead of failing fast.
+    connect_args={"timeout": 30} if _IS_SQLITE else {},
 )
 
+if _IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_conn, _record):
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
@@ -26,10 +47,100 @@ Base = declarative_base()
 
 # ── Helpers (backward-compatible with existing main.py) ──
 
+# Bump whenever db_models changes so workers re-run the bootstrap once.
+SCHEMA_VERSION = 3
+
+
 def init_db() -> None:
-    """Create all tables that are registered on Base.metadata."""
+    """Bring the schema up to SCHEMA_VERSION.
+
+    An up-to-date database costs a single query against schema_version.
+    Otherwise the bootstrap runs in one transaction under a database-wide
+    lock, so workers starting together apply it once instead of racing.
+    DB_BOOTSTRAP=create_all forces the full create_all + introspection path.
+    """
+    force = os.getenv("DB_BOOTSTRAP", "versioned").lower() == "create_all"
+    if not force and _stored_schema_version() >= SCHEMA_VERSION:
+        return
     import db_models  # noqa: F401  – ensures models are registered
-    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        _lock_bootstrap(conn)
+        # Another worker may have finished the bootstrap while we waited.
+        if force or _locked_schema_version(conn) < SCHEMA_VERSION:
+            Base.metadata.create_all(bind=conn)
+            _add_missing_columns(conn)
+            conn.execute(text("DELETE FROM schema_version WHERE version <> :v"), {"v": SCHEMA_VERSION})
+            conn.execute(
+                text(
+                    "INSERT INTO schema_version(version) SELECT :v "
+                    "WHERE NOT EXISTS (SELECT 1 FROM schema_version WHERE version = :v)"
+                ),
+                {"v": SCHEMA_VERSION},
+            )
+        conn.commit()
+
+
+# Arbitrary key shared by every worker; only used for the bootstrap lock.
+_BOOTSTRAP_LOCK_KEY = 72_173_032
+
+
+def _lock_bootstrap(conn) -> None:
+    """Take a lock held until the bootstrap transaction commits or rolls back."""
+    if _IS_SQLITE:
+        # Takes the write lock up front; other workers wait on the busy timeout.
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+    elif conn.dialect.name == "postgresql":
+        conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _BOOTSTRAP_LOCK_KEY})
+
+
+def _stored_schema_version() -> int:
+    try:
+        with engine.connect() as conn:
+            version = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    except DBAPIError:
+        # No schema_version table yet: database predates versioned bootstrap.
+        return 0
+    return version or 0
+
+
+def _locked_schema_version(conn) -> int:
+    # Check for the table first: a failed SELECT would abort a Postgres transaction.
+    if not inspect(conn).has_table("schema_version"):
+        return 0
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def prewarm_pool(size: int) -> int:
+    """Open up to `size` pooled connections in parallel so first requests skip connect/auth."""
+    pool_size = getattr(engine.pool, "size", None)
+    if callable(pool_size):
+        size = min(size, pool_size())
+    if size <= 0:
+        return 0
+
+    def _open(_):
+        conn = engine.connect()
+        conn.execute(text("SELECT 1"))
+        return conn
+
+    with ThreadPoolExecutor(max_workers=size) as executor:
+        conns = list(executor.map(_open, range(size)))
+    for conn in conns:
+        conn.close()  # returns the live connection to the pool
+    return size
+
+
+def _add_missing_columns(conn) -> None:
+    """create_all never alters existing tables; add nullable columns added to models since."""
+    inspector = inspect(conn)
+    if_not_exists = "IF NOT EXISTS " if conn.dialect.name == "postgresql" else ""
+    for table in Base.metadata.sorted_tables:
+        existing = {col["name"] for col in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing or not column.nullable:
+                continue
+            col_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {if_not_exists}{column.name} {col_type}"))
 
 
 class _RowProxy:
@@ -74,6 +185,15 @@ class _CursorResult:
         rows = self._result.fetchall()
         return [_RowProxy(r._mapping) for r in rows]
 
+    def fetchone_dict(self):
+        """Like fetchone but returns a plain dict, ready for serialization."""
+        row = self._result.fetchone()
+        return None if row is None else dict(row._mapping)
+
+    def fetchall_dicts(self):
+        """Like fetchall but returns plain dicts, ready for serialization."""
+        return [dict(r._mapping) for r in self._result.fetchall()]
+
 
 class _SessionWrapper:
     """Thin wrapper around a SQLAlchemy Session so that existing code using
@@ -83,22 +203,33 @@ class _SessionWrapper:
         self._session = session
 
     def execute(self, sql, params=None):
-        # Convert ?-style placeholders to :pN named params for SQLAlchemy text()
-        if params:
-            converted_sql, bound = _convert_qmark(sql, params)
-            result = self._session.execute(text(converted_sql), bound)
-        else:
-            result = self._session.execute(text(sql))
+        statement = _statement_kind(sql)
+        start = time.perf_counter()
+        try:
+            # Convert ?-style placeholders to :pN named params for SQLAlchemy text()
+            if params:
+                converted_sql, bound = _convert_qmark(sql, params)
+                result = self._session.execute(text(converted_sql), bound)
+            else:
+                result = self._session.execute(text(sql))
+        except Exception:
+            DB_QUERY_ERRORS.inc(statement=statement)
+            raise
+        finally:
+            DB_QUERY_SECONDS.observe(time.perf_counter() - start, statement=statement)
 
         wrapper = _CursorResult(result)
 
         # Attempt to capture lastrowid for INSERT statements
-        if sql.strip().upper().startswith("INSERT"):
+        if statement == "insert":
             try:
                 pk = result.inserted_primary_key
                 wrapper.lastrowid = pk[0] if pk else None
             except Exception:
                 wrapper.lastrowid = None
+            # Textual INSERTs carry no compiled primary key; SQLite's cursor knows it.
+            if wrapper.lastrowid is None and _IS_SQLITE:
+                wrapper.lastrowid = result.lastrowid
 
         return wrapper
 
@@ -109,6 +240,13 @@ class _SessionWrapper:
         self._session.close()
 
 
+def _statement_kind(sql: str) -> str:
+    """Return the lower-cased leading SQL verb, used as a metrics label."""
+    head = sql.lstrip().split(None, 1)
+    verb = head[0].lower() if head else ""
+    return verb if verb in {"select", "insert", "update", "delete"} else "other"
+
+
 def _convert_qmark(sql: str, params: tuple) -> tuple[str, dict]:
     """Replace ? placeholders with :p0, :p1, … and return (sql, bound_dict)."""
     parts = sql.split("?")
@@ -3,6 +3,7 @@ SQLAlchemy table models for Secure Stego Chat.
 
 Existing tables: users, sessions, messages, detection_logs
 New tables:      images, steg_analysis_logs, security_alerts
+Bookkeeping:     schema_version (see database.SCHEMA_VERSION)
 """
 
 from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
@@ -36,7 +37,7 @@ class Message(Base):
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     message_type = Column(String, nullable=False)
     content = Column(Text, nullable=False)
-    is_suspicious = Column(Integer, nullable=False, default=0)
+    is_suspicious = Column(Integer, nullable=False, default=0, server_default="0")
     warning = Column(Text, nullable=True)
     created_at = Column(String, nullable=False, server_default=func.now())
 
@@ -63,6 +64,9 @@ class Image(Base):
     filepath = Column(Text, nullable=False)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=True)
     message_id = Column(Integer, ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+    phash = Column(String(16), nullable=True)  # 64-bit DCT perceptual hash, hex
+    # 1 when this image's own analysis flagged it; only these seed the near-duplicate index.
+    flagged_by_analysis = Column(Integer, nullable=True)
     created_at = Column(String, nullable=False, server_default=func.now())
 
 
@@ -85,5 +89,14 @@ class SecurityAlert(Base):
     severity = Column(String, nullable=True)
     description = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
-    resolved = Column(Integer, nullable=False, default=0)
+    resolved = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(String, nullable=False, server_default=func.now())
+
+
+# ── Bookkeeping ──
+
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    version = Column(Integer, primary_key=True)
+    applied_at = Column(String, nullable=False, server_default=func.now())
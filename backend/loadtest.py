@@ -0,0 +1,298 @@
+"""
+Load-generation harness for the chat backend.
+
+Registers N synthetic users, opens a /ws socket for each, then mixes
+send_text and send_image traffic at fixed open-loop rates and measures
+end-to-end delivery latency (POST issued → message.created received on the
+receiver's socket).
+
+By default everything runs offline: DATABASE_URL is pointed at a local
+SQLite file (uploads go to an uploads/ directory beside it) and main.app is
+served by an in-process uvicorn on 127.0.0.1.
+Client and server then share one interpreter, so results are a lower bound
+for a dedicated worker; pass --url to target a separately started server.
+
+    cd backend
+    python loadtest.py --users 50 --text-rate 40 --image-rate 4 --duration 30
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import secrets
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.sent = 0
+        self.ok = 0
+        self.errors = 0
+        self.lost = 0
+        self.post_latency: list[float] = []
+        self.delivery_latency: list[float] = []
+
+    def summary(self, elapsed: float) -> dict:
+        return {
+            "sent": self.sent,
+            "ok": self.ok,
+            "errors": self.errors,
+            "undelivered": self.lost,
+            "throughput_per_s": round(self.ok / elapsed, 2) if elapsed else 0.0,
+            "post_ms": _latency_summary(self.post_latency),
+            "delivery_ms": _latency_summary(self.delivery_latency),
+        }
+
+
+def _latency_summary(values: list[float]) -> dict:
+    return {
+        "p50": round(_percentile(values, 50) * 1000, 2),
+        "p90": round(_percentile(values, 90) * 1000, 2),
+        "p99": round(_percentile(values, 99) * 1000, 2),
+        "max": round(max(values) * 1000, 2) if values else 0.0,
+    }
+
+
+def _make_png(size: int) -> bytes:
+    from PIL import Image
+
+    img = Image.frombytes("RGB", (size, size), os.urandom(size * size * 3))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_local_server(db_path: Path) -> tuple[str, object, threading.Thread]:
+    """Serve main.app on loopback against a SQLite file; return (url, server, thread)."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("UPLOAD_DIR", str(db_path.parent / "uploads"))
+    import uvicorn
+    import main
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="loadtest-server", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline or not thread.is_alive():
+            raise RuntimeError("local server failed to start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+
+class LoadTest:
+    def __init__(self, base_url: str, args: argparse.Namespace) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.ws_url = "ws" + self.base_url[len("http"):]
+        self.args = args
+        self.users: list[dict] = []
+        self.sockets = []
+        self.stats = {"text": _Stats(), "image": _Stats()}
+        self._arrivals: dict[int, asyncio.Future] = {}
+        self._images: list[bytes] = []
+
+    def _arrival(self, message_id: int) -> asyncio.Future:
+        fut = self._arrivals.get(message_id)
+        if fut is None:
+            fut = self._arrivals[message_id] = asyncio.get_running_loop().create_future()
+        return fut
+
+    async def _register(self, client, index: int, prefix: str, gate: asyncio.Semaphore) -> dict:
+        async with gate:
+            resp = await client.post(
+                "/api/register",
+                json={"username": f"{prefix}_{index}", "password": "loadtest-pass"},
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            return {"id": data["user"]["id"], "token": data["token"]}
+
+    async def _listen(self, user_id: int, ws) -> None:
+        import websockets
+
+        try:
+            async for raw in ws:
+                received = time.perf_counter()
+                event = json.loads(raw)
+                if event.get("type") != "message.created":
+                    continue
+                message = event["message"]
+                if message["receiver_id"] != user_id:
+                    continue
+                fut = self._arrival(message["id"])
+                if not fut.done():
+                    fut.set_result(received)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _send(self, client, kind: str) -> None:
+        sender, receiver = random.sample(self.users, 2)
+        stats = self.stats[kind]
+        headers = {"Authorization": f"Bearer {sender['token']}"}
+        stats.sent += 1
+        start = time.perf_counter()
+        try:
+            if kind == "text":
+                resp = await client.post(
+                    "/api/messages/text",
+                    json={"receiver_id": receiver["id"], "content": f"load {secrets.token_hex(8)}"},
+                    headers=headers,
+                )
+            else:
+                resp = await client.post(
+                    "/api/messages/image",
+                    data={"receiver_id": str(receiver["id"])},
+                    files={"file": ("load.png", random.choice(self._images), "image/png")},
+                    headers=headers,
+                )
+            resp.raise_for_status()
+        except Exception:
+            stats.errors += 1
+            return
+        stats.post_latency.append(time.perf_counter() - start)
+        fut = self._arrival(resp.json()["id"])
+        try:
+            arrived = await asyncio.wait_for(asyncio.shield(fut), timeout=self.args.delivery_timeout)
+        except asyncio.TimeoutError:
+            stats.lost += 1
+            return
+        stats.ok += 1
+        stats.delivery_latency.append(arrived - start)
+
+    async def _generate(self, client, kind: str, rate: float, until: float, tasks: list) -> None:
+        if rate <= 0:
+            return
+        while True:
+            # Poisson arrivals: an open-loop generator keeps offering load even
+            # when the server falls behind, which is what exposes saturation.
+            await asyncio.sleep(random.expovariate(rate))
+            if time.perf_counter() >= until:
+                return
+            tasks.append(asyncio.create_task(self._send(client, kind)))
+
+    async def run(self) -> dict:
+        import httpx
+        import websockets
+
+        args = self.args
+        self._images = [_make_png(args.image_size) for _ in range(4)]
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=60) as client:
+            prefix = f"lt{secrets.token_hex(3)}"
+            gate = asyncio.Semaphore(args.concurrency)
+            self.users = await asyncio.gather(
+                *(self._register(client, i, prefix, gate) for i in range(args.users))
+            )
+
+            listeners = []
+            for user in self.users:
+                ws = await websockets.connect(f"{self.ws_url}/ws?token={user['token']}", max_size=None)
+                self.sockets.append(ws)
+                listeners.append(asyncio.create_task(self._listen(user["id"], ws)))
+
+            tasks: list[asyncio.Task] = []
+            start = time.perf_counter()
+            until = start + args.duration
+            await asyncio.gather(
+                self._generate(client, "text", args.text_rate, until, tasks),
+                self._generate(client, "image", args.image_rate, until, tasks),
+            )
+            await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+
+            for ws in self.sockets:
+                await ws.close()
+            await asyncio.gather(*listeners, return_exceptions=True)
+
+        return {
+            "users": args.users,
+            "duration_s": round(elapsed, 2),
+            "offered_rate": {"text": args.text_rate, "image": args.image_rate},
+            "text": self.stats["text"].summary(elapsed),
+            "image": self.stats["image"].summary(elapsed),
+        }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"users={report['users']} duration={report['duration_s']}s "
+        f"offered text={report['offered_rate']['text']}/s image={report['offered_rate']['image']}/s",
+        f"{'kind':<6} {'sent':>6} {'ok':>6} {'err':>5} {'lost':>5} {'msg/s':>8} "
+        f"{'post p50':>9} {'p99':>8} {'deliv p50':>10} {'p90':>8} {'p99':>8} {'max':>8}",
+    ]
+    for kind in ("text", "image"):
+        s = report[kind]
+        lines.append(
+            f"{kind:<6} {s['sent']:>6} {s['ok']:>6} {s['errors']:>5} {s['undelivered']:>5} "
+            f"{s['throughput_per_s']:>8} {s['post_ms']['p50']:>9} {s['post_ms']['p99']:>8} "
+            f"{s['delivery_ms']['p50']:>10} {s['delivery_ms']['p90']:>8} {s['delivery_ms']['p99']:>8} "
+            f"{s['delivery_ms']['max']:>8}"
+        )
+    lines.append("(latencies in ms; delivery = POST issued → message.created on receiver socket)")
+    return "\n".join(lines)
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load-test the Secure Stego Chat backend.")
+    parser.add_argument("--users", type=int, default=20, help="synthetic users (each opens one /ws)")
+    parser.add_argument("--text-rate", type=float, default=20.0, help="text messages per second")
+    parser.add_argument("--image-rate", type=float, default=2.0, help="image messages per second")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of traffic generation")
+    parser.add_argument("--image-size", type=int, default=256, help="edge length of generated PNGs")
+    parser.add_argument("--concurrency", type=int, default=64, help="max concurrent HTTP connections")
+    parser.add_argument("--delivery-timeout", type=float, default=10.0, help="seconds to wait for delivery")
+    parser.add_argument("--db", type=Path, default=None, help="SQLite file for the in-process server")
+    parser.add_argument("--url", default=None, help="target an already running server instead")
+    parser.add_argument("--json", type=Path, default=None, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+    if args.users < 2:
+        parser.error("--users must be at least 2")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    server = thread = None
+    if args.url:
+        base_url = args.url
+    else:
+        db_path = args.db or Path(tempfile.mkdtemp(prefix="stego-load-")) / "loadtest.db"
+        base_url, server, thread = _start_local_server(db_path.resolve())
+        print(f"serving main.app at {base_url} with sqlite:///{db_path}")
+
+    try:
+        report = asyncio.run(LoadTest(base_url, args).run())
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
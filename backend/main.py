@@ -1,30 +1,69 @@
+from startup_timing import startup_report  # first import: times everything below
+
 import hashlib
 import os
 import secrets
-import uuid
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
-from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi import Depends, FastAPI, File, Form, Header, HTTPException, Request, UploadFile, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response
 
-from database import get_conn, init_db, SessionLocal
+from database import get_conn, init_db, prewarm_pool, SessionLocal
 import db_models  # noqa: F401 – register SQLAlchemy table metadata
+from metrics import CACHE_REQUESTS, HTTP_REQUEST_SECONDS, STEGO_STAGE_SECONDS, render_latest
 from models import LoginRequest, RegisterRequest, TextMessageRequest
-from steganography import classify_extracted_text, detect_lsb_steganography, extract_lsb_data, log_detection_event
+from profiler import profiler_from_env
+from serialization import (
+    MESSAGE_SELECT,
+    encode_message,
+    encode_messages,
+    encode_rows,
+    json_bytes_response,
+    message_created_event,
+)
+from static_assets import FrontendAssets, UploadStaticFiles, content_address, precompress_enabled
+from thumbnails import ThumbnailCache
 from websocket_manager import WebSocketManager
 
-app = FastAPI(title="Secure Stego Chat")
+# Application imports only; uvicorn and lifespan setup land in "ready".
+startup_report.record("import", time.perf_counter() - startup_report.t0)
+
+app = FastAPI(title="Secure Stego Chat", default_response_class=ORJSONResponse)
 manager = WebSocketManager()
+slow_profiler = profiler_from_env()
 
 BASE_DIR = Path(__file__).resolve().parent
 PROJECT_ROOT = BASE_DIR.parent
 FRONTEND_DIR = PROJECT_ROOT / "frontend"
-UPLOAD_DIR = BASE_DIR / "uploads"
+UPLOAD_DIR = Path(os.getenv("UPLOAD_DIR") or BASE_DIR / "uploads")
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
+thumbnail_cache = ThumbnailCache(UPLOAD_DIR, int(os.getenv("THUMBNAIL_CACHE_MB", "256")) * 1024 * 1024)
+# Near-duplicate lookup over perceptual hashes of flagged images (per worker).
+# PHASH_MATCH_POLICY: "analyse" runs the full pipeline; the verdict is the image's own,
+# and a match is always recorded (warning + detection log), even on a clean verdict.
+# "reuse" skips analysis and flags the upload as a near-duplicate of the matched message
+# (a reference, not a copy of its payload); "off" disables lookups.
+PHASH_MATCH_POLICY = os.getenv("PHASH_MATCH_POLICY", "analyse").lower()
+PHASH_MAX_DISTANCE = int(os.getenv("PHASH_MAX_DISTANCE", "8"))
+flagged_index = None  # HammingIndex, built with the imaging stack on first image request
+
+# Pillow, NumPy and the steganography package are imported on first use
+# rather than at boot; see load_imaging().
+_imaging = None
+_imaging_lock = threading.Lock()
+
+frontend_assets = FrontendAssets(
+    FRONTEND_DIR,
+    ["index.html", "chat.html", "style.css", "script.js", "config.js"],
+    precompress=precompress_enabled(),
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -38,7 +77,46 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
+app.mount("/uploads", UploadStaticFiles(directory=UPLOAD_DIR, thumbnails=thumbnail_cache), name="uploads")
+
+
+class RequestMetricsMiddleware:
+    """Plain ASGI middleware: BaseHTTPMiddleware would add a task and a body
+    stream to every response, file downloads included."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            end = time.perf_counter()
+            # Label by route template (/api/messages/{peer_id}) to keep cardinality bounded.
+            route = scope.get("route")
+            label = getattr(route, "path", None) or scope.get("root_path") or "<unmatched>"
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(end - start, route=label, method=method, status=str(status))
+            if slow_profiler is not None:
+                slow_profiler.record(f"{method} {label}", start, end)
+            if not startup_report.first_request_done:
+                startup_report.mark_first_request()
+
+
+app.add_middleware(RequestMetricsMiddleware)
 
 
 def password_hash(password: str, salt: str) -> str:
@@ -72,9 +150,69 @@ def get_current_user(authorization: str | None = Header(default=None)) -> dict:
     return {"id": row["id"], "username": row["username"], "token": token}
 
 
+def load_flagged_index():
+    from phash_index import HammingIndex
+
+    index = HammingIndex()
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT i.phash, i.message_id
+            FROM images i
+            JOIN messages m ON m.id = i.message_id
+            WHERE m.is_suspicious = 1 AND i.flagged_by_analysis = 1 AND i.phash IS NOT NULL
+            """
+        ).fetchall()
+    for row in rows:
+        index.add(int(row["phash"], 16), row["message_id"])
+    return index
+
+
+def load_imaging():
+    """Import the steganography stack and build the flagged-image index once.
+
+    Blocking (imports + one query); call via run_in_threadpool from async code.
+    """
+    global _imaging, flagged_index
+    if _imaging is None:
+        with _imaging_lock:
+            if _imaging is None:
+                with startup_report.phase("imaging_load"):
+                    import steganography
+
+                    flagged_index = load_flagged_index()
+                    _imaging = steganography
+    return _imaging
+
+
+def find_flagged_duplicate(phash: int | None) -> tuple[int, int] | None:
+    """Return (distance, message_id) of the nearest flagged near-duplicate, if any."""
+    if phash is None or PHASH_MATCH_POLICY == "off":
+        return None
+    match = flagged_index.nearest(phash, PHASH_MAX_DISTANCE)
+    CACHE_REQUESTS.inc(cache="phash", result="hit" if match else "miss")
+    return match
+
+
 @app.on_event("startup")
 def startup() -> None:
-    init_db()
+    with startup_report.phase("schema"):
+        init_db()
+    with startup_report.phase("assets"):
+        frontend_assets.load()
+    prewarm = int(os.getenv("DB_POOL_PREWARM", "0"))
+    if prewarm > 0:
+        with startup_report.phase("db_prewarm"):
+            prewarm_pool(prewarm)
+    startup_report.record("ready", time.perf_counter() - startup_report.t0)
+    if slow_profiler is not None:
+        slow_profiler.start()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    if slow_profiler is not None:
+        slow_profiler.stop()
 
 
 @app.get("/api/health")
@@ -82,24 +220,34 @@ def health() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/api/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(render_latest(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
-def root_page():
-    return FileResponse(FRONTEND_DIR / "index.html")
+def root_page(request: Request):
+    return frontend_assets.response("index.html", request)
 
 
 @app.get("/chat")
-def chat_page():
-    return FileResponse(FRONTEND_DIR / "chat.html")
+def chat_page(request: Request):
+    return frontend_assets.response("chat.html", request)
 
 
 @app.get("/style.css")
-def style_asset():
-    return FileResponse(FRONTEND_DIR / "style.css")
+def style_asset(request: Request):
+    return frontend_assets.response("style.css", request)
 
 
 @app.get("/script.js")
-def script_asset():
-    return FileResponse(FRONTEND_DIR / "script.js")
+def script_asset(request: Request):
+    return frontend_assets.response("script.js", request)
+
+
+@app.get("/config.js")
+def config_asset(request: Request):
+    return frontend_assets.response("config.js", request)
 
 
 @app.post("/api/register")
@@ -157,43 +305,32 @@ def list_users(current_user: dict = Depends(get_current_user)) -> list[dict]:
 
 
 @app.get("/api/messages/{peer_id}")
-def get_messages(peer_id: int, current_user: dict = Depends(get_current_user)) -> list[dict]:
+def get_messages(peer_id: int, current_user: dict = Depends(get_current_user)) -> Response:
     with get_conn() as conn:
         rows = conn.execute(
-            """
-            SELECT m.id, m.sender_id, m.receiver_id, m.message_type, m.content,
-                   m.is_suspicious, m.warning, m.created_at, u.username AS sender_username
-            FROM messages m
-            JOIN users u ON u.id = m.sender_id
+            MESSAGE_SELECT
+            + """
             WHERE (m.sender_id = ? AND m.receiver_id = ?)
                OR (m.sender_id = ? AND m.receiver_id = ?)
             ORDER BY m.id ASC
             """,
             (current_user["id"], peer_id, peer_id, current_user["id"]),
-        ).fetchall()
+        ).fetchall_dicts()
+
+    return json_bytes_response(encode_messages(rows))
 
-    return [
-        {
-            "id": row["id"],
-            "sender_id": row["sender_id"],
-            "receiver_id": row["receiver_id"],
-            "sender_username": row["sender_username"],
-            "message_type": row["message_type"],
-            "content": row["content"],
-            "is_suspicious": bool(row["is_suspicious"]),
-            "warning": row["warning"],
-            "created_at": row["created_at"],
-        }
-        for row in rows
-    ]
 
+def fetch_encoded_message(conn, message_id: int) -> bytes:
+    row = conn.execute(MESSAGE_SELECT + " WHERE m.id = ?", (message_id,)).fetchone_dict()
+    return encode_message(row)
 
-async def publish_message(message: dict) -> None:
-    await manager.send_to_many([message["sender_id"], message["receiver_id"]], {"type": "message.created", "message": message})
+
+async def publish_message(sender_id: int, receiver_id: int, message: bytes) -> None:
+    await manager.send_to_many([sender_id, receiver_id], message_created_event(message))
 
 
 @app.post("/api/messages/text")
-async def send_text(payload: TextMessageRequest, current_user: dict = Depends(get_current_user)) -> dict:
+async def send_text(payload: TextMessageRequest, current_user: dict = Depends(get_current_user)) -> Response:
     with get_conn() as conn:
         receiver = conn.execute("SELECT id FROM users WHERE id = ?", (payload.receiver_id,)).fetchone()
         if not receiver:
@@ -210,29 +347,10 @@ async def send_text(payload: TextMessageRequest, current_user: dict = Depends(ge
         conn.commit()
         msg_id = cur.lastrowid
 
-        row = conn.execute(
-            """
-            SELECT id, sender_id, receiver_id, message_type, content,
-                   is_suspicious, warning, created_at
-            FROM messages
-            WHERE id = ?
-            """,
-            (msg_id,),
-        ).fetchone()
+        message = fetch_encoded_message(conn, msg_id)
 
-    message = {
-        "id": row["id"],
-        "sender_id": row["sender_id"],
-        "receiver_id": row["receiver_id"],
-        "sender_username": current_user["username"],
-        "message_type": row["message_type"],
-        "content": row["content"],
-        "is_suspicious": bool(row["is_suspicious"]),
-        "warning": row["warning"],
-        "created_at": row["created_at"],
-    }
-    await publish_message(message)
-    return message
+    await publish_message(current_user["id"], payload.receiver_id, message)
+    return json_bytes_response(message)
 
 
 @app.post("/api/messages/image")
@@ -240,39 +358,88 @@ async def send_image(
     receiver_id: int = Form(...),
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user),
-) -> dict:
+) -> Response:
     if not file.content_type or not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="Only image files are allowed")
 
     ext = os.path.splitext(file.filename or "")[1] or ".png"
-    saved_name = f"{uuid.uuid4().hex}{ext}"
-    saved_path = UPLOAD_DIR / saved_name
 
     data = await file.read()
     if not data:
         raise HTTPException(status_code=400, detail="Empty file")
 
-    with saved_path.open("wb") as f:
-        f.write(data)
-
-    # Always attempt extraction — don't gate on detector heuristic
-    extracted_text = extract_lsb_data(str(saved_path))
-    is_code, language, code_confidence, patterns = classify_extracted_text(extracted_text)
-    suspicious, detector_confidence = detect_lsb_steganography(str(saved_path))
-
-    # Mark suspicious if either classifier found code OR detector flagged it
-    marked_suspicious = bool(is_code) or suspicious
-    warning = None
-    if is_code:
-        warning = (
-            f"Hidden code detected "
-            f"({language}, confidence={code_confidence}%, detector={detector_confidence}%)."
-        )
-    elif suspicious:
-        warning = (
-            f"Potential hidden data detected (detector confidence={detector_confidence}%)."
-        )
-
+    # Content-addressed name: identical uploads share one file, and the URL
+    # can be served with an immutable cache policy.
+    saved_name = f"{content_address(data)}{ext.lower()}"
+    saved_path = UPLOAD_DIR / saved_name
+    if not saved_path.exists():
+        # Write to a temp name and rename: a concurrent upload of the same image
+        # may already be analysing saved_path, and must never see it truncated.
+        tmp_path = saved_path.with_name(f".{saved_name}.{secrets.token_hex(8)}.tmp")
+        try:
+            with tmp_path.open("wb") as f:
+                f.write(data)
+            os.replace(tmp_path, saved_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    # Only the first image request pays for the threadpool hop and the imports.
+    stego = _imaging if _imaging is not None else await run_in_threadpool(load_imaging)
+
+    with STEGO_STAGE_SECONDS.time(stage="phash"):
+        phash = stego.compute_phash(str(saved_path))
+    duplicate = find_flagged_duplicate(phash)
+
+    # False when the verdict is inherited from a match. Only analysed, flagged images
+    # seed the index, so reused verdicts can't chain from one near-duplicate to the next.
+    analysed = not (duplicate is not None and PHASH_MATCH_POLICY == "reuse")
+    if not analysed:
+        # Nothing was extracted from this file; point at the flagged original instead.
+        distance, prior_id = duplicate
+        extracted_text = ""
+        language = None
+        marked_suspicious = True
+        warning = f"Near-duplicate of a flagged image (message {prior_id}, distance={distance})."
+        reason = f"near_duplicate_of=message:{prior_id}; distance={distance}; analysis skipped"
+    else:
+        # Decode once for both passes; an undecodable file yields no pixels, which
+        # extract/detect treat the same way as their own decode failure.
+        with STEGO_STAGE_SECONDS.time(stage="decode"):
+            pixels = stego.load_gray_pixels(str(saved_path)) or []
+        # Always attempt extraction — don't gate on detector heuristic
+        with STEGO_STAGE_SECONDS.time(stage="extract"):
+            extracted_text = stego.extract_lsb_data(str(saved_path), pixels)
+        with STEGO_STAGE_SECONDS.time(stage="classify"):
+            is_code, language, code_confidence, patterns = stego.classify_extracted_text(extracted_text)
+        with STEGO_STAGE_SECONDS.time(stage="detect"):
+            suspicious, detector_confidence = stego.detect_lsb_steganography(str(saved_path), pixels)
+
+        # Mark suspicious if either classifier found code OR detector flagged it
+        marked_suspicious = bool(is_code) or suspicious
+        warning = None
+        if is_code:
+            warning = (
+                f"Hidden code detected "
+                f"({language}, confidence={code_confidence}%, detector={detector_confidence}%)."
+            )
+        elif suspicious:
+            warning = (
+                f"Potential hidden data detected (detector confidence={detector_confidence}%)."
+            )
+        reason = f"patterns={patterns}; detector_confidence={detector_confidence}%"
+
+        if duplicate is not None:
+            distance, prior_id = duplicate
+            reason += f"; phash_match=message:{prior_id}; distance={distance}"
+            if not marked_suspicious:
+                # Keep the verdict clean but don't drop the match on the floor.
+                warning = (
+                    f"Near-duplicate of flagged message {prior_id} (distance={distance}); "
+                    f"no hidden data found in this copy."
+                )
+
+    flagged_by_analysis = analysed and marked_suspicious
     now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     with get_conn() as conn:
@@ -293,8 +460,26 @@ async def send_image(
         conn.commit()
         msg_id = cur.lastrowid
 
-        if marked_suspicious:
-            reason = f"patterns={patterns}; detector_confidence={detector_confidence}%"
+        conn.execute(
+            """
+            INSERT INTO images(filename, filepath, uploaded_by, message_id, phash, flagged_by_analysis)
+            VALUES(?, ?, ?, ?, ?, ?)
+            """,
+            (
+                saved_name,
+                f"/uploads/{saved_name}",
+                current_user["id"],
+                msg_id,
+                f"{phash:016x}" if phash is not None else None,
+                1 if flagged_by_analysis else 0,
+            ),
+        )
+        conn.commit()
+
+        if flagged_by_analysis and phash is not None:
+            flagged_index.add(phash, msg_id)
+        # A near-duplicate match is logged even when this copy came back clean.
+        if marked_suspicious or duplicate is not None:
             conn.execute(
                 """
                 INSERT INTO detection_logs(message_id, image_name, extracted_text, detected_language, reason)
@@ -303,35 +488,16 @@ async def send_image(
                 (msg_id, saved_name, extracted_text[:2000], language, reason),
             )
             conn.commit()
-            log_detection_event(msg_id, saved_name, language, reason)
+            stego.log_detection_event(msg_id, saved_name, language, reason)
 
-        row = conn.execute(
-            """
-            SELECT id, sender_id, receiver_id, message_type, content,
-                   is_suspicious, warning, created_at
-            FROM messages
-            WHERE id = ?
-            """,
-            (msg_id,),
-        ).fetchone()
+        message = fetch_encoded_message(conn, msg_id)
 
-    message = {
-        "id": row["id"],
-        "sender_id": row["sender_id"],
-        "receiver_id": row["receiver_id"],
-        "sender_username": current_user["username"],
-        "message_type": row["message_type"],
-        "content": row["content"],
-        "is_suspicious": bool(row["is_suspicious"]),
-        "warning": row["warning"],
-        "created_at": row["created_at"],
-    }
-    await publish_message(message)
-    return message
+    await publish_message(current_user["id"], receiver_id, message)
+    return json_bytes_response(message)
 
 
 @app.get("/api/security/logs")
-def security_logs(current_user: dict = Depends(get_current_user)) -> list[dict]:
+def security_logs(current_user: dict = Depends(get_current_user)) -> Response:
     # Any authenticated user can read logs in this simple version.
     with get_conn() as conn:
         rows = conn.execute(
@@ -340,8 +506,8 @@ def security_logs(current_user: dict = Depends(get_current_user)) -> list[dict]:
             FROM detection_logs
             ORDER BY id DESC
             """
-        ).fetchall()
-    return [dict(r) for r in rows]
+        ).fetchall_dicts()
+    return json_bytes_response(encode_rows(rows))
 
 
 @app.get("/api/messages/{message_id}/hidden-code")
@@ -0,0 +1,99 @@
+"""
+Multi-index hashing (MIH) for Hamming-radius lookups over 64-bit
+perceptual hashes.
+
+Each hash is split into `chunks` substrings, each indexed in its own
+table. By the pigeonhole principle, two hashes within distance r agree
+to within r // chunks bits on at least one substring, so a query only
+probes the substring neighbourhoods of that radius and verifies the
+candidates with a vectorised popcount.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Per-element population count of a uint64 array (SWAR bit trick)."""
+    values = values - ((values >> np.uint64(1)) & _M1)
+    values = (values & _M2) + ((values >> np.uint64(2)) & _M2)
+    values = (values + (values >> np.uint64(4))) & _M4
+    return (values * _H01) >> np.uint64(56)
+
+
+@lru_cache(maxsize=None)
+def _flip_masks(bits: int, radius: int) -> tuple[int, ...]:
+    masks = [0]
+    for r in range(1, radius + 1):
+        for positions in combinations(range(bits), r):
+            mask = 0
+            for p in positions:
+                mask |= 1 << p
+            masks.append(mask)
+    return tuple(masks)
+
+
+class HammingIndex:
+    """Append-only index of 64-bit hashes with attached payloads.
+
+    The default of 5 substrings suits radius ~8: each query probes 14
+    neighbours per table (70 dict lookups) regardless of index size.
+    """
+
+    def __init__(self, bits: int = 64, chunks: int = 5) -> None:
+        self.bits = bits
+        self.chunks = chunks
+        base, extra = divmod(bits, chunks)
+        self._widths = [base + (1 if i < extra else 0) for i in range(chunks)]
+        self._offsets = [sum(self._widths[:i]) for i in range(chunks)]
+        self._tables: list[defaultdict[int, list[int]]] = [defaultdict(list) for _ in range(chunks)]
+        self._hashes: list[int] = []
+        self._payloads: list[object] = []
+        self._array = np.empty(1024, dtype=np.uint64)  # packed copy of _hashes, grown by doubling
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _substrings(self, value: int) -> list[int]:
+        return [(value >> off) & ((1 << width) - 1) for off, width in zip(self._offsets, self._widths)]
+
+    def add(self, value: int, payload: object = None) -> None:
+        slot = len(self._hashes)
+        self._hashes.append(value)
+        self._payloads.append(payload)
+        if slot == len(self._array):
+            self._array = np.resize(self._array, 2 * len(self._array))
+        self._array[slot] = value
+        for table, sub in zip(self._tables, self._substrings(value)):
+            table[sub].append(slot)
+
+    def search(self, value: int, max_distance: int) -> list[tuple[int, object]]:
+        """Return (distance, payload) for every entry within max_distance, nearest first."""
+        candidates: list[int] = []
+        radius = max_distance // self.chunks
+        for table, sub, width in zip(self._tables, self._substrings(value), self._widths):
+            for mask in _flip_masks(width, radius):
+                bucket = table.get(sub ^ mask)
+                if bucket:
+                    candidates.extend(bucket)
+        if not candidates:
+            return []
+
+        slots = np.unique(np.array(candidates, dtype=np.int64))
+        distances = popcount64(self._array[slots] ^ np.uint64(value))
+        keep = distances <= max_distance
+        slots, distances = slots[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return [(int(distances[i]), self._payloads[slots[i]]) for i in order]
+
+    def nearest(self, value: int, max_distance: int) -> tuple[int, object] | None:
+        hits = self.search(value, max_distance)
+        return hits[0] if hits else None
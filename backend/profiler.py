@@ -0,0 +1,131 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+Enable by setting STEGO_PROFILE_SLOW_MS (e.g. 250). While enabled a daemon
+thread samples every thread's stack every STEGO_PROFILE_INTERVAL_MS
+(default 5 ms) into a short ring buffer. When a request takes longer than
+the threshold, the samples that fall inside its time window are collapsed
+into hot stacks and appended to backend/slow_requests.log.
+
+Async handlers share the event-loop thread and sync handlers run on a
+thread pool, so a sample cannot be attributed to one request: the dump is
+process-wide and lists how many other requests overlapped the window.
+Reports are built and written by the sampler thread, never on the loop.
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from pathlib import Path
+
+_LOG_FILE = Path(__file__).resolve().parent / "slow_requests.log"
+
+# Innermost frames in these files mean the thread is parked, not working.
+_IDLE_FILES = ("threading.py", "selectors.py", "queue.py", "base_events.py", "profiler.py")
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms: float, interval_ms: float = 5.0, top: int = 10, window_s: float = 120.0) -> None:
+        self.threshold_s = threshold_ms / 1000.0
+        self.interval_s = max(interval_ms, 1.0) / 1000.0
+        self.top = top
+        self._samples: deque = deque(maxlen=int(window_s / self.interval_s))
+        # (start, end) of recently finished requests, for the overlap count.
+        self._windows: deque = deque(maxlen=4096)
+        self._pending: deque = deque()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="slow-request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            now = time.perf_counter()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if os.path.basename(frame.f_code.co_filename) in _IDLE_FILES:
+                    continue
+                self._samples.append((now, _stack(frame)))
+            while self._pending:
+                self._write(*self._pending.popleft())
+        while self._pending:
+            self._write(*self._pending.popleft())
+
+    def hot_stacks(self, start: float, end: float) -> list[tuple[tuple[str, ...], int]]:
+        counts = Counter(stack for ts, stack in list(self._samples) if start <= ts <= end)
+        return counts.most_common(self.top)
+
+    def record(self, label: str, start: float, end: float) -> None:
+        """Queue a hot-stack dump if the request exceeded the threshold.
+
+        Cheap enough to call from the event loop; the sampler thread does
+        the aggregation and the file write.
+        """
+        self._windows.append((start, end))
+        if end - start >= self.threshold_s:
+            self._pending.append((label, start, end))
+
+    def _write(self, label: str, start: float, end: float) -> None:
+        stacks = self.hot_stacks(start, end)
+        overlapping = sum(1 for s, e in list(self._windows) if s < end and e > start) - 1
+        lines = [
+            f"[{datetime.now().isoformat()}] slow request {label} took {(end - start) * 1000:.1f} ms "
+            f"(process-wide samples, {overlapping} other requests overlapped)"
+        ]
+        if not stacks:
+            lines.append("  (no samples captured)")
+        for stack, hits in stacks:
+            lines.append(f"  {hits} samples (~{hits * self.interval_s * 1000:.0f} ms):")
+            lines.extend(f"    {frame}" for frame in stack)
+        try:
+            _LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with _LOG_FILE.open("a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            pass
+
+
+def _stack(frame, limit: int = 40) -> tuple[str, ...]:
+    """Outermost-first frame labels, walked via f_back without touching linecache."""
+    frames = []
+    while frame is not None and len(frames) < limit:
+        code = frame.f_code
+        frames.append(f"{os.path.basename(code.co_filename)}:{frame.f_lineno}:{code.co_name}")
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+def profiler_from_env() -> SlowRequestProfiler | None:
+    """Return a profiler when STEGO_PROFILE_SLOW_MS is set, otherwise None."""
+    threshold = _env_float("STEGO_PROFILE_SLOW_MS", None)
+    if threshold is None:
+        return None
+    interval = _env_float("STEGO_PROFILE_INTERVAL_MS", 5.0)
+    return SlowRequestProfiler(threshold, interval)
@@ -0,0 +1,48 @@
+"""
+Single row-to-JSON path for chat messages.
+
+Message queries select columns in the order and names clients expect, so a
+row dict only needs is_suspicious normalised before orjson turns it into
+bytes. Those bytes are returned as the HTTP body and spliced into the
+WebSocket event unchanged, so a message is encoded exactly once.
+"""
+
+import orjson
+from fastapi.responses import Response
+
+# Every message query selects exactly these columns, in this order.
+MESSAGE_SELECT = """
+    SELECT m.id, m.sender_id, m.receiver_id, u.username AS sender_username,
+           m.message_type, m.content, m.is_suspicious, m.warning, m.created_at
+    FROM messages m
+    JOIN users u ON u.id = m.sender_id
+"""
+
+
+def _normalise(row: dict) -> dict:
+    row["is_suspicious"] = bool(row["is_suspicious"])
+    return row
+
+
+def encode_message(row: dict) -> bytes:
+    """Encode one MESSAGE_SELECT row dict (mutated in place) as JSON bytes."""
+    return orjson.dumps(_normalise(row))
+
+
+def encode_messages(rows: list[dict]) -> bytes:
+    """Encode a list of MESSAGE_SELECT row dicts (mutated in place) as a JSON array."""
+    return orjson.dumps([_normalise(row) for row in rows])
+
+
+def encode_rows(rows: list[dict]) -> bytes:
+    return orjson.dumps(rows)
+
+
+def message_created_event(message: bytes) -> str:
+    """Wrap already-encoded message bytes in a message.created WebSocket frame."""
+    return '{"type":"message.created","message":' + message.decode("utf-8") + "}"
+
+
+def json_bytes_response(body: bytes) -> Response:
+    """Return pre-encoded JSON without FastAPI's jsonable_encoder pass."""
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,69 @@
+"""
+Startup phase timings and time-to-first-request.
+
+main.py imports this module first, so its import timestamp is the start of
+the application's own import work. Each phase is exported as a gauge, and
+a one-line report is logged once the first request has been served.
+"""
+
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from metrics import STARTUP_PHASE_SECONDS
+
+_logger = logging.getLogger("uvicorn.error")
+
+
+def _process_age() -> float | None:
+    """Seconds since the OS started this process (Linux only; None elsewhere)."""
+    try:
+        with open("/proc/self/stat", encoding="ascii") as f:
+            # Field 22 is start time in clock ticks after boot; comm (field 2) may contain spaces.
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", encoding="ascii") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupReport:
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self.process_age_at_t0 = _process_age()
+        self.phases: dict[str, float] = {}
+        self.first_request_done = False
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases[name] = seconds
+        STARTUP_PHASE_SECONDS.set(seconds, phase=name)
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def mark_first_request(self) -> None:
+        if self.first_request_done:
+            return
+        self.first_request_done = True
+        self.record("first_request", time.perf_counter() - self.t0)
+        _logger.info("startup timing: %s", self.summary())
+
+    def summary(self) -> str:
+        parts = [f"{name}={seconds * 1000:.1f}ms" for name, seconds in self.phases.items()]
+        if self.process_age_at_t0 is not None:
+            # Adds interpreter and server boot, which happen before main.py is imported.
+            for name in ("ready", "first_request"):
+                if name in self.phases:
+                    total = self.process_age_at_t0 + self.phases[name]
+                    parts.append(f"process_start_to_{name}={total * 1000:.0f}ms")
+        return " ".join(parts)
+
+
+startup_report = StartupReport()
@@ -0,0 +1,186 @@
+"""
+Cache-friendly static serving for uploads and the frontend assets.
+
+Uploads are stored under content-addressed names (hex digest + extension),
+so they can be cached forever and the name itself is a strong ETag.
+Frontend assets live at unversioned URLs: they are read once at startup,
+given a content-hash ETag and optional gzip/brotli variants, and served
+with `no-cache` so that repeat loads revalidate with a 304.
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import stat
+from pathlib import Path
+
+import anyio
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+from starlette.datastructures import Headers, QueryParams
+from starlette.exceptions import HTTPException
+from starlette.responses import PlainTextResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from thumbnails import ThumbnailCache, UndecodableImage, is_derivative, snap_width
+
+try:  # brotli is optional; gzip variants are always built.
+    import brotli
+except ImportError:  # pragma: no cover - depends on environment
+    brotli = None
+
+_CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{32,64}$")
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+def content_address(data: bytes) -> str:
+    """Return the digest used to name an uploaded file."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class UploadStaticFiles(StaticFiles):
+    """StaticFiles that marks content-addressed uploads as immutable.
+
+    Byte ranges and conditional requests are handled by Starlette's
+    FileResponse / is_not_modified; this only sets a strong ETag and the
+    cache policy. With a ThumbnailCache, `?w=<width>` serves a downscaled
+    WebP (or JPEG for clients that don't accept WebP) derivative.
+    """
+
+    def __init__(self, *args, thumbnails: ThumbnailCache | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.thumbnails = thumbnails
+
+    async def get_response(self, path: str, scope) -> Response:
+        width = QueryParams(scope["query_string"]).get("w")
+        if width is None or self.thumbnails is None:
+            return await super().get_response(path, scope)
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405)
+        if not width.isdigit() or int(width) <= 0:
+            raise HTTPException(status_code=400, detail="w must be a positive integer")
+
+        full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode) or is_derivative(Path(full_path).name):
+            raise HTTPException(status_code=404)
+
+        fmt = "webp" if "image/webp" in Headers(scope=scope).get("accept", "") else "jpg"
+        try:
+            # Decoding and resampling are CPU-bound; keep them off the event loop.
+            derivative, derivative_stat = await anyio.to_thread.run_sync(
+                self.thumbnails.get, Path(full_path), snap_width(int(width)), fmt
+            )
+        except UndecodableImage:
+            raise HTTPException(status_code=415, detail="Not a decodable image")
+        response = self.file_response(derivative, derivative_stat, scope)
+        response.headers["vary"] = "Accept"
+        return response
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        name = Path(full_path).name
+        stem = name.split(".", 1)[0]
+        if _CONTENT_ADDRESSED.match(stem):
+            # Derivatives inherit immutability from their content-addressed original.
+            headers = {"etag": f'"{name.replace(".", "-")}"', "cache-control": IMMUTABLE_CACHE}
+        else:
+            headers = {"cache-control": REVALIDATE_CACHE}
+
+        response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def _accepted_encodings(header: str | None) -> set[str]:
+    accepted = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(token)
+    return accepted
+
+
+def _etag_matches(if_none_match: str | None, etags: set[str]) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+
+class _Asset:
+    def __init__(self, body: bytes, media_type: str, precompress: bool) -> None:
+        self.media_type = media_type
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # encoding -> (body, etag); each representation needs its own strong ETag.
+        self.variants: dict[str, tuple[bytes, str]] = {"identity": (body, f'"{digest}"')}
+        if precompress:
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.variants["gzip"] = (gz, f'"{digest}-gz"')
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.variants["br"] = (br, f'"{digest}-br"')
+        self.etags = {etag for _, etag in self.variants.values()}
+
+    def pick(self, accept_encoding: str | None) -> str:
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+class FrontendAssets:
+    """In-memory table of frontend files with ETags and precompressed variants."""
+
+    def __init__(self, directory: Path, names: list[str], precompress: bool = True) -> None:
+        self.directory = directory
+        self.names = names
+        self.precompress = precompress
+        self._assets: dict[str, _Asset] = {}
+
+    def load(self) -> None:
+        assets = {}
+        for name in self.names:
+            path = self.directory / name
+            if not path.is_file():
+                continue
+            media_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+            if media_type.startswith("text/") or media_type.endswith("javascript"):
+                media_type += "; charset=utf-8"
+            assets[name] = _Asset(path.read_bytes(), media_type, self.precompress)
+        self._assets = assets
+
+    def response(self, name: str, request: Request) -> Response:
+        asset = self._assets.get(name)
+        if asset is None:
+            return PlainTextResponse("Not Found", status_code=404)
+
+        encoding = asset.pick(request.headers.get("accept-encoding"))
+        body, etag = asset.variants[encoding]
+        headers = {"etag": etag, "cache-control": REVALIDATE_CACHE, "vary": "Accept-Encoding"}
+        if _etag_matches(request.headers.get("if-none-match"), asset.etags):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["content-encoding"] = encoding
+        return Response(body, media_type=asset.media_type, headers=headers)
+
+
+def precompress_enabled() -> bool:
+    return os.getenv("PRECOMPRESS_ASSETS", "1").lower() not in ("0", "false", "no")
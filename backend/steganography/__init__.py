@@ -2,10 +2,14 @@ from .detector import detect_lsb_steganography
 from .extractor import extract_lsb_data
 from .code_classifier import classify_extracted_text
 from .logger import log_detection_event
+from .pixels import load_gray_pixels
+from .perceptual_hash import compute_phash
 
 __all__ = [
     "detect_lsb_steganography",
     "extract_lsb_data",
     "classify_extracted_text",
     "log_detection_event",
+    "load_gray_pixels",
+    "compute_phash",
 ]
@@ -3,19 +3,21 @@ from PIL import Image
 _DELIMITER = "#####"
 
 
-def detect_lsb_steganography(image_path: str) -> tuple[bool, float]:
+def detect_lsb_steganography(image_path: str, pixels: list[int] | None = None) -> tuple[bool, float]:
     """
     Two-pass LSB steganography detection:
     1. Definitive check — attempt LSB extraction and look for the delimiter.
     2. Statistical heuristic — chi-square test on the first portion of pixels
        where payloads are typically embedded.
     Returns (likely_hidden_data, confidence_percent).
+    Pass `pixels` (from load_gray_pixels) to skip decoding the file again.
     """
-    try:
-        with Image.open(image_path).convert("L") as img:
-            pixels = list(img.getdata())
-    except Exception:
-        return False, 0.0
+    if pixels is None:
+        try:
+            with Image.open(image_path).convert("L") as img:
+                pixels = list(img.getdata())
+        except Exception:
+            return False, 0.0
 
     # ── Pass 1: Try to find the delimiter in the LSB stream ──
     bits = "".join(str(p & 1) for p in pixels)
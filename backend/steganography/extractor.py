@@ -5,14 +5,16 @@ _DELIMITER = "#####"
 _PRINTABLE = set(string.printable)
 
 
-def extract_lsb_data(image_path: str) -> str:
+def extract_lsb_data(image_path: str, pixels: list[int] | None = None) -> str:
     """
     Reads LSB stream and returns printable extracted text.
     Stops on delimiter or first non-printable byte.
+    Pass `pixels` (from load_gray_pixels) to skip decoding the file again.
     """
     try:
-        with Image.open(image_path).convert("L") as img:
-            pixels = list(img.getdata())
+        if pixels is None:
+            with Image.open(image_path).convert("L") as img:
+                pixels = list(img.getdata())
 
         bits = "".join(str(p & 1) for p in pixels)
         out = []
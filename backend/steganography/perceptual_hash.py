@@ -0,0 +1,44 @@
+import numpy as np
+from PIL import Image
+
+_HASH_SIZE = 8
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so a 2-D DCT is D @ A @ D.T."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.astype(np.uint8).ravel()).tobytes(), "big")
+
+
+def _load_gray(image_path: str, size: tuple[int, int]) -> np.ndarray:
+    with Image.open(image_path) as img:
+        small = img.convert("L").resize(size, Image.Resampling.LANCZOS)
+    return np.asarray(small, dtype=np.float64)
+
+
+def compute_phash(image_path: str) -> int | None:
+    """
+    64-bit DCT perceptual hash: the low-frequency 8x8 DCT block of a 32x32
+    grayscale thumbnail, thresholded at its median (DC term excluded).
+    Stable under re-encoding, resizing and mild colour changes.
+    Returns None if the image cannot be decoded.
+    """
+    try:
+        pixels = _load_gray(image_path, (_DCT_SIZE, _DCT_SIZE))
+    except Exception:
+        return None
+    coeffs = (_DCT @ pixels @ _DCT.T)[:_HASH_SIZE, :_HASH_SIZE]
+    median = np.median(coeffs.ravel()[1:])
+    return _bits_to_int(coeffs > median)
+
@@ -0,0 +1,13 @@
+from PIL import Image
+
+
+def load_gray_pixels(image_path: str) -> list[int] | None:
+    """
+    Decodes the image to 8-bit grayscale and returns its pixel values.
+    Returns None if the image cannot be decoded.
+    """
+    try:
+        with Image.open(image_path).convert("L") as img:
+            return list(img.getdata())
+    except Exception:
+        return None
@@ -0,0 +1,77 @@
+"""
+Schema bootstrap: upgrading a pre-versioned SQLite file, and several
+workers bootstrapping the same file at once.
+
+database.py builds its engine from DATABASE_URL at import time, so each
+bootstrap runs in its own interpreter, as a uvicorn worker would.
+
+    cd backend
+    python -m pytest test_database.py
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+_BACKEND = Path(__file__).resolve().parent
+
+
+def _start_init_db(db_path: Path) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", "import database; database.init_db(); print(database.SCHEMA_VERSION)"],
+        cwd=_BACKEND,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{db_path}"},
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def _run_init_db(db_path: Path, workers: int = 1) -> int:
+    """Run init_db in `workers` parallel processes; return database.SCHEMA_VERSION."""
+    procs = [_start_init_db(db_path) for _ in range(workers)]
+    versions = set()
+    for proc in procs:
+        stdout, stderr = proc.communicate(timeout=60)
+        assert proc.returncode == 0, stderr
+        versions.add(int(stdout))
+    (version,) = versions
+    return version
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> set[str]:
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def test_upgrades_pre_versioned_database(tmp_path):
+    db_path = tmp_path / "legacy.db"
+    with sqlite3.connect(db_path) as conn:
+        # The images table as it was before perceptual hashes, with one row.
+        conn.execute(
+            "CREATE TABLE images (id INTEGER PRIMARY KEY, filename VARCHAR NOT NULL, filepath TEXT NOT NULL, "
+            "uploaded_by INTEGER, message_id INTEGER, created_at VARCHAR NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        conn.execute("INSERT INTO images(filename, filepath) VALUES('a.png', '/uploads/a.png')")
+
+    schema_version = _run_init_db(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        assert "phash" in _columns(conn, "images")
+        assert conn.execute("SELECT filename, phash FROM images").fetchall() == [("a.png", None)]
+        assert conn.execute("SELECT version FROM schema_version").fetchall() == [(schema_version,)]
+        assert "detection_logs" in {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+
+    # A second boot is a no-op and keeps a single version row.
+    _run_init_db(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT version FROM schema_version").fetchall() == [(schema_version,)]
+
+
+def test_concurrent_workers_bootstrap_once(tmp_path):
+    db_path = tmp_path / "fresh.db"
+    schema_version = _run_init_db(db_path, workers=6)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT version FROM schema_version").fetchall() == [(schema_version,)]
+        assert "phash" in _columns(conn, "images")
@@ -0,0 +1,58 @@
+"""
+HammingIndex must return exactly what a linear scan returns.
+
+    cd backend
+    python -m pytest test_phash_index.py
+"""
+
+import random
+
+import numpy as np
+
+from phash_index import HammingIndex, popcount64
+
+
+def _flip(value: int, bits: int, rng: random.Random) -> int:
+    for position in rng.sample(range(64), bits):
+        value ^= 1 << position
+    return value
+
+
+def _linear_scan(values: list[int], query: int, max_distance: int) -> list[tuple[int, int]]:
+    hits = [((value ^ query).bit_count(), slot) for slot, value in enumerate(values)]
+    return sorted(hit for hit in hits if hit[0] <= max_distance)
+
+
+def test_search_matches_linear_scan():
+    rng = random.Random(1234)
+    # More than the initial 1024-slot array, so growth is exercised too.
+    values = [rng.getrandbits(64) for _ in range(3000)]
+    # Clusters of near-duplicates so some queries have several hits.
+    for base in values[:50]:
+        values.extend(_flip(base, rng.randint(0, 12), rng) for _ in range(3))
+    index = HammingIndex()
+    for slot, value in enumerate(values):
+        index.add(value, slot)
+
+    for max_distance in (0, 3, 8, 9, 12):
+        for q in range(200):
+            query = _flip(rng.choice(values), rng.randint(0, 14), rng) if q % 2 == 0 else rng.getrandbits(64)
+            found = index.search(query, max_distance)
+            assert sorted(found) == _linear_scan(values, query, max_distance)
+            assert [d for d, _ in found] == sorted(d for d, _ in found)
+
+
+def test_nearest_and_empty_index():
+    index = HammingIndex()
+    assert index.nearest(0, 8) is None
+    index.add(0b1111, "far")
+    index.add(0b0001, "near")
+    assert index.nearest(0, 8) == (1, "near")
+    assert index.nearest(0, 0) is None
+
+
+def test_popcount64_matches_int_bit_count():
+    rng = random.Random(99)
+    values = [0, 1, (1 << 64) - 1] + [rng.getrandbits(64) for _ in range(500)]
+    counts = popcount64(np.array(values, dtype=np.uint64))
+    assert counts.tolist() == [v.bit_count() for v in values]
@@ -0,0 +1,43 @@
+"""
+Upload serving: strong ETags, 304 revalidation and byte ranges.
+
+    cd backend
+    python -m pytest test_static_assets.py
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from static_assets import IMMUTABLE_CACHE, UploadStaticFiles, content_address
+
+
+def _client(tmp_path) -> tuple[TestClient, str, bytes]:
+    data = bytes(range(256)) * 4
+    name = f"{content_address(data)}.png"
+    (tmp_path / name).write_bytes(data)
+    app = FastAPI()
+    app.mount("/uploads", UploadStaticFiles(directory=tmp_path), name="uploads")
+    return TestClient(app), f"/uploads/{name}", data
+
+
+def test_upload_is_immutable_and_revalidates_with_304(tmp_path):
+    client, url, data = _client(tmp_path)
+    first = client.get(url)
+    assert first.status_code == 200
+    assert first.content == data
+    assert first.headers["cache-control"] == IMMUTABLE_CACHE
+    etag = first.headers["etag"]
+    assert not etag.startswith("W/")
+
+    again = client.get(url, headers={"if-none-match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+def test_upload_serves_byte_ranges(tmp_path):
+    client, url, data = _client(tmp_path)
+    response = client.get(url, headers={"range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 10-19/{len(data)}"
+    assert response.content == data[10:20]
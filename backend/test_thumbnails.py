@@ -0,0 +1,61 @@
+"""
+Thumbnail derivatives: LRU eviction under the byte cap, and undecodable
+originals mapped to 415.
+
+    cd backend
+    python -m pytest test_thumbnails.py
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from static_assets import UploadStaticFiles
+from thumbnails import ThumbnailCache, derivative_name
+
+
+def _original(directory, name: str, seed: int):
+    path = directory / name
+    Image.effect_noise((400, 400), 40 + seed).convert("RGB").save(path)
+    return path
+
+
+def test_evicts_least_recently_used_within_byte_cap(tmp_path):
+    a, b, c = (_original(tmp_path, f"{n}.png", i) for i, n in enumerate("abc"))
+    cache = ThumbnailCache(tmp_path, max_bytes=10**9)
+    sizes = {p.name: cache.get(p, 160, "jpg")[1].st_size for p in (a, b, c)}
+    for p in (a, b, c):
+        (tmp_path / derivative_name(p, 160, "jpg")).unlink()
+
+    # Room for all but one derivative, whatever their exact encoded sizes.
+    cache = ThumbnailCache(tmp_path, max_bytes=sum(sizes.values()) - 1)
+    cache.get(a, 160, "jpg")
+    cache.get(b, 160, "jpg")
+    cache.get(a, 160, "jpg")  # hit: a becomes most recently used
+    cache.get(c, 160, "jpg")
+
+    assert (tmp_path / derivative_name(a, 160, "jpg")).exists()
+    assert not (tmp_path / derivative_name(b, 160, "jpg")).exists()
+    assert (tmp_path / derivative_name(c, 160, "jpg")).exists()
+    assert cache._total == sizes["a.png"] + sizes["c.png"] <= cache.max_bytes
+
+
+def test_hit_returns_stat_of_existing_derivative(tmp_path):
+    original = _original(tmp_path, "a.png", 0)
+    cache = ThumbnailCache(tmp_path, max_bytes=10**9)
+    path, first = cache.get(original, 320, "webp")
+    again, second = cache.get(original, 320, "webp")
+    assert path == again
+    assert first.st_size == second.st_size == path.stat().st_size
+
+
+def test_undecodable_original_is_415(tmp_path):
+    (tmp_path / "broken.png").write_bytes(b"\x89PNG\r\n\x1a\nnot really a png")
+    app = FastAPI()
+    app.mount(
+        "/uploads",
+        UploadStaticFiles(directory=tmp_path, thumbnails=ThumbnailCache(tmp_path, 10**9)),
+        name="uploads",
+    )
+    response = TestClient(app).get("/uploads/broken.png?w=160")
+    assert response.status_code == 415
@@ -0,0 +1,161 @@
+"""
+Downscaled preview derivatives for uploaded images.
+
+Derivatives are generated lazily on the first `/uploads/<name>?w=<width>`
+request and written next to the original as `<stem>.w<width>.<webp|jpg>`.
+Requested widths snap to a small fixed set so the cache stays bounded,
+and total derivative size is capped with least-recently-used eviction.
+"""
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from metrics import CACHE_REQUESTS
+
+THUMBNAIL_WIDTHS = (160, 320, 640)
+_DERIVATIVE_NAME = re.compile(r"^.+\.w\d+\.(webp|jpg)$")
+_FORMATS = {"webp": ("WEBP", {"quality": 80, "method": 4}), "jpg": ("JPEG", {"quality": 82, "optimize": True})}
+
+
+def snap_width(requested: int) -> int:
+    """Return the smallest supported width that covers `requested`."""
+    for width in THUMBNAIL_WIDTHS:
+        if requested <= width:
+            return width
+    return THUMBNAIL_WIDTHS[-1]
+
+
+def derivative_name(original: Path, width: int, fmt: str) -> str:
+    return f"{original.stem}.w{width}.{fmt}"
+
+
+def is_derivative(name: str) -> bool:
+    return bool(_DERIVATIVE_NAME.match(name))
+
+
+class UndecodableImage(Exception):
+    """The original could not be decoded as an image Pillow is willing to open."""
+
+
+def _render(original: Path, target: Path, width: int, fmt: str) -> None:
+    from PIL import Image, ImageOps  # deferred: keeps Pillow out of worker cold start
+
+    pil_format, options = _FORMATS[fmt]
+    try:
+        img = Image.open(original)
+    except (OSError, ValueError, SyntaxError, EOFError, Image.DecompressionBombError) as exc:
+        raise UndecodableImage(str(exc)) from exc
+    with img:
+        try:
+            img = ImageOps.exif_transpose(img)
+            if fmt == "jpg" and img.mode != "RGB":
+                # JPEG has no alpha: flatten onto white instead of black.
+                rgba = img.convert("RGBA")
+                img = Image.new("RGB", img.size, (255, 255, 255))
+                img.paste(rgba, mask=rgba.getchannel("A"))
+            img.thumbnail((width, width * 4), Image.Resampling.LANCZOS)
+        except (OSError, ValueError, SyntaxError, EOFError, Image.DecompressionBombError) as exc:
+            # Truncated or malformed data often only surfaces once pixels are loaded.
+            raise UndecodableImage(str(exc)) from exc
+        # Write to a temp name and rename so readers never see a partial file.
+        tmp = target.with_name(f".{target.name}.{threading.get_ident()}.tmp")
+        try:
+            img.save(tmp, pil_format, **options)
+            os.replace(tmp, target)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+
+
+class ThumbnailCache:
+    """On-disk derivative cache with size-based LRU eviction.
+
+    All methods block on disk and image I/O; call them from a worker thread.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total = 0
+        self._scanned = False
+
+    def _scan(self) -> None:
+        # Seed recency from mtimes so eviction order survives restarts.
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and is_derivative(entry.name):
+                stat = entry.stat()
+                found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._total += size
+        self._scanned = True
+
+    def _touch(self, name: str) -> None:
+        with self._lock:
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        try:
+            os.utime(self.directory / name)
+        except OSError:
+            pass
+
+    def _add(self, name: str, size: int) -> None:
+        evicted = []
+        with self._lock:
+            self._total += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old, old_size = self._entries.popitem(last=False)
+                self._total -= old_size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(self.directory / old)
+            except FileNotFoundError:
+                pass
+
+    def get(self, original: Path, width: int, fmt: str) -> tuple[Path, os.stat_result]:
+        """Return the derivative's path and stat, generating it on a miss.
+
+        The stat is taken here so the caller never has to touch the disk
+        on the event loop, where it could also race with eviction.
+        Raises UndecodableImage if the original cannot be decoded.
+        """
+        with self._lock:
+            if not self._scanned:
+                self._scan()
+        name = derivative_name(original, width, fmt)
+        target = self.directory / name
+        try:
+            stat_result = target.stat()
+        except FileNotFoundError:
+            stat_result = None
+        if stat_result is not None:
+            CACHE_REQUESTS.inc(cache="thumbnail", result="hit")
+            self._touch(name)
+            return target, stat_result
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(name, threading.Lock())
+        try:
+            with key_lock:
+                # Another request may have produced it while we waited.
+                try:
+                    stat_result = target.stat()
+                    self._touch(name)
+                except FileNotFoundError:
+                    CACHE_REQUESTS.inc(cache="thumbnail", result="miss")
+                    _render(original, target, width, fmt)
+                    stat_result = target.stat()
+                    self._add(name, stat_result.st_size)
+        finally:
+            with self._lock:
+                self._key_locks.pop(name, None)
+        return target, stat_result
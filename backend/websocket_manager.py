@@ -1,6 +1,10 @@
 from collections import defaultdict
+
+import orjson
 from fastapi import WebSocket
 
+from metrics import WS_CONNECTED_USERS, WS_CONNECTIONS, WS_MESSAGES_SENT, WS_SEND_QUEUE_DEPTH
+
 
 class WebSocketManager:
     def __init__(self) -> None:
@@ -9,24 +13,40 @@ class WebSocketManager:
     async def connect(self, user_id: int, websocket: WebSocket) -> None:
         await websocket.accept()
         self.connections[user_id].add(websocket)
+        self._update_gauges()
 
     def disconnect(self, user_id: int, websocket: WebSocket) -> None:
         if user_id in self.connections:
             self.connections[user_id].discard(websocket)
             if not self.connections[user_id]:
                 del self.connections[user_id]
+        self._update_gauges()
+
+    def _update_gauges(self) -> None:
+        WS_CONNECTIONS.set(sum(len(sockets) for sockets in self.connections.values()))
+        WS_CONNECTED_USERS.set(len(self.connections))
 
-    async def send_to_user(self, user_id: int, payload: dict) -> None:
+    async def send_to_user(self, user_id: int, payload: dict | str) -> None:
+        # A pre-encoded str is sent as-is, so fan-out never re-encodes per socket.
+        if not isinstance(payload, str):
+            payload = orjson.dumps(payload).decode("utf-8")
         dead = []
-        for ws in self.connections.get(user_id, set()):
+        for ws in list(self.connections.get(user_id, set())):
+            WS_SEND_QUEUE_DEPTH.inc()
             try:
-                await ws.send_json(payload)
+                await ws.send_text(payload)
+                WS_MESSAGES_SENT.inc(outcome="ok")
             except Exception:
+                WS_MESSAGES_SENT.inc(outcome="error")
                 dead.append(ws)
+            finally:
+                WS_SEND_QUEUE_DEPTH.dec()
         for ws in dead:
             self.disconnect(user_id, ws)
 
-    async def send_to_many(self, user_ids: list[int], payload: dict) -> None:
+    async def send_to_many(self, user_ids: list[int], payload: dict | str) -> None:
+        if not isinstance(payload, str):
+            payload = orjson.dumps(payload).decode("utf-8")
         seen = set()
         for uid in user_ids:
             if uid in seen:
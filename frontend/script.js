@@ -4,6 +4,11 @@ function getToken() {
   return localStorage.getItem("token") || "";
 }
 
+// Downscaled preview served by the backend thumbnail cache.
+function thumbUrl(path, width) {
+  return `${API_BASE}${path}?w=${width}`;
+}
+
 function getCurrentUser() {
   const raw = localStorage.getItem("user");
   return raw ? JSON.parse(raw) : null;
@@ -154,7 +159,7 @@ function setupChatPage() {
     if (msg.message_type === "image" && isSuspicious) {
       body = `
         <div class="stego-image-wrap" data-msg-id="${msg.id}">
-          <img src="${API_BASE}${msg.content}" alt="image">
+          <img src="${thumbUrl(msg.content, 320)}" srcset="${thumbUrl(msg.content, 640)} 2x" loading="lazy" alt="image">
           <div class="stego-overlay">
             <div class="stego-badge">
               <svg viewBox="0 0 24 24"><path d="M1 21h22L12 2 1 21zm12-3h-2v-2h2v2zm0-4h-2v-4h2v4z"/></svg>
@@ -164,7 +169,7 @@ function setupChatPage() {
           </div>
         </div>`;
     } else if (msg.message_type === "image") {
-      body = `<img src="${API_BASE}${msg.content}" alt="image">`;
+      body = `<img src="${thumbUrl(msg.content, 320)}" srcset="${thumbUrl(msg.content, 640)} 2x" loading="lazy" alt="image">`;
     } else {
       body = `<div>${escapeHtml(msg.content)}</div>`;
     }
@@ -497,7 +502,7 @@ function setupChatPage() {
         const imgName = m.content.split("/").pop();
         return `
           <tr>
-            <td><img src="${API_BASE}${m.content}" style="width:40px;height:40px;object-fit:cover;border-radius:6px;${m.is_suspicious ? "filter:blur(4px);" : ""}"></td>
+            <td><img src="${thumbUrl(m.content, 160)}" loading="lazy" style="width:40px;height:40px;object-fit:cover;border-radius:6px;${m.is_suspicious ? "filter:blur(4px);" : ""}"></td>
             <td>${escapeHtml(imgName)}</td>
             <td>${escapeHtml(m.sender_username || "—")}</td>
             <td>${status}</td>